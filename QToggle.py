@@ -3,8 +3,10 @@ Author: Luan Dias - https://github.com/luandiasrj
 Url: https://github.com/luandiasrj/QToggle_-_Advanced_QCheckbox_for_PyQT6
 
 This code implements a custom QToggle class, which is a toggle switch derived
-from QCheckBox. The QToggle class features customizable colors, and properties.
-It includes smooth transitions when toggling between states.
+from QAbstractButton. The QToggle class features customizable colors, and
+properties. It includes smooth transitions when toggling between states.
+It keeps QCheckBox's two-state API (stateChanged, checkStateChanged,
+checkState and setCheckState), but does not support tristate mode.
 
 The custom properties include:
 
@@ -20,8 +22,8 @@ Main functions and methods in the class include:
     setDuration: Set the duration for the animation
     update_pos_color: Updates the circle position and background color
     start_transition: Starts the transition animation when the state changes
-    create_animation: Creates the circle position animation
-    create_bg_color_animation: Creates the background color animation
+    nextCheckState: Toggles the state and animates user-initiated changes
+    checkState / setCheckState: QCheckBox-style access to the checked state
     sizeHint: Provides the recommended size for the toggle
     hitButton: Determines if the mouse click is inside the toggle area
     paintEvent: Handles the custom painting of the toggle
@@ -30,47 +32,103 @@ The example demonstrates how to use the QToggle class by creating three
 different toggles with various settings such as custom height, colors, and font.
 """
 
-from PyQt6.QtCore import Qt, QRect, pyqtProperty, QPropertyAnimation, QPoint, \
-    QEasingCurve
-from PyQt6.QtGui import QColor, QFontMetrics, QPainter, QPainterPath, QBrush, \
-    QPen, QFont
-from PyQt6.QtWidgets import QApplication, QWidget, QCheckBox, QVBoxLayout
-
-
-class QToggle(QCheckBox):
-    bg_color = pyqtProperty(
-        QColor, lambda self: self._bg_color,
-        lambda self, col: setattr(self, '_bg_color', col))
-    circle_color = pyqtProperty(
-        QColor, lambda self: self._circle_color,
-        lambda self, col: setattr(self, '_circle_color', col))
-    active_color = pyqtProperty(
-        QColor, lambda self: self._active_color,
-        lambda self, col: setattr(self, '_active_color', col))
-    disabled_color = pyqtProperty(
-        QColor, lambda self: self._disabled_color,
-        lambda self, col: setattr(self, '_disabled_color', col))
-    text_color = pyqtProperty(
-        QColor, lambda self: self._text_color,
-        lambda self, col: setattr(self, '_text_color', col))
+import math
+
+from PyQt6.QtCore import Qt, QRect, QRectF, pyqtProperty, QVariantAnimation, \
+    QAbstractAnimation, QPoint, QSize, QEasingCurve, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QFontMetrics, QPainter, QBrush, QPen, QFont, \
+    QPixmap
+from PyQt6.QtWidgets import QApplication, QWidget, QAbstractButton, \
+    QVBoxLayout
+
+
+class QToggle(QAbstractButton):
+    # Kept for QCheckBox API compatibility (two-state only, no tristate)
+    stateChanged = pyqtSignal(int)
+    checkStateChanged = pyqtSignal(Qt.CheckState)
+
+    # Painting constants, resolved once instead of on every frame
+    _NO_PEN = Qt.PenStyle.NoPen
+    _ANTIALIASING = QPainter.RenderHint.Antialiasing
+    _FRAME_CACHE_SIZE = 128  # Maximum number of cached toggle pixmaps
+
+    @pyqtProperty(QColor)
+    def bg_color(self):
+        return self._bg_color
+
+    @bg_color.setter
+    def bg_color(self, col):
+        self._bg_color = col
+
+    @pyqtProperty(QColor)
+    def circle_color(self):
+        return self._circle_color
+
+    @circle_color.setter
+    def circle_color(self, col):
+        self._circle_color = col
+
+    @pyqtProperty(QColor)
+    def active_color(self):
+        return self._active_color
+
+    @active_color.setter
+    def active_color(self, col):
+        self._active_color = col
+
+    @pyqtProperty(QColor)
+    def disabled_color(self):
+        return self._disabled_color
+
+    @disabled_color.setter
+    def disabled_color(self, col):
+        self._disabled_color = col
+        self._disabled_pixmap = None
+
+    @pyqtProperty(QColor)
+    def text_color(self):
+        return self._text_color
+
+    @text_color.setter
+    def text_color(self, col):
+        self._text_color = col
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setCheckable(True)
         self._bg_color, self._circle_color, self._active_color, \
             self._disabled_color, self._text_color = QColor("#0BF"), \
             QColor("#DDD"), QColor('#777'), QColor("#CCC"), QColor("#000")
-        self._circle_pos, self._intermediate_bg_color = None, None
-        self.setFixedHeight(18)
+        self._circle_pos, self._cached_bg_qcolor = None, QColor()
+        # Painting tools reused across frames, recolored only when needed
+        solid = Qt.BrushStyle.SolidPattern
+        self._bg_brush, self._circle_brush, self._text_pen = \
+            QBrush(solid), QBrush(solid), QPen()
+        self._text_w = None  # Cached text width, reset on text/font change
+        self._frame_cache: dict[tuple, QPixmap] = {}  # LRU of toggle frames
+        self._disabled_pixmap = None  # Static frame blitted while disabled
+        self._text_baseline = None  # Cached baseline, reset on font/resize
+        self.setFixedHeight(18)  # Also computes the cached geometry
         self._animation_duration = 500  # milliseconds
-        self.stateChanged.connect(self.start_transition)
-        self._user_checked = False  # Introduced flag to check user-initiated changes
-
-    circle_pos = pyqtProperty(
-        float, lambda self: self._circle_pos,
-        lambda self, pos: (setattr(self, '_circle_pos', pos), self.update()))
-    intermediate_bg_color = pyqtProperty(
-        QColor, lambda self: self._intermediate_bg_color,
-        lambda self, col: setattr(self, '_intermediate_bg_color', col))
+        self._anim_start, self._anim_end = None, None  # Off/on (pos, rgba)
+        self._anim = QVariantAnimation(self)  # Reused for every transition
+        self._anim.setStartValue(0.0)
+        self._anim.setEndValue(1.0)
+        self._anim.setEasingCurve(QEasingCurve.Type.InOutCubic)
+        self._anim.setDuration(self._animation_duration)
+        self._anim.valueChanged.connect(self._on_anim_tick)
+        self._anim.finished.connect(self._update_toggle)  # Exact final frame
+        # Programmatic changes jump straight to the final position and color
+        self.toggled.connect(self._on_toggled)
+
+    @pyqtProperty(float)
+    def circle_pos(self):
+        return self._circle_pos
+
+    @circle_pos.setter
+    def circle_pos(self, pos):
+        self._circle_pos = pos
+        self._update_toggle()
 
     def setDuration(self, duration: int):
         """
@@ -78,95 +136,186 @@ class QToggle(QCheckBox):
         :param duration: Duration in milliseconds.
         """
         self._animation_duration = duration
+        self._anim.setDuration(duration)
+
+    def setFixedHeight(self, h: int):
+        super().setFixedHeight(h)
+        self._recompute_geom()
+
+    def _recompute_geom(self):
+        """
+        Cache the geometry derived from the widget height, so it is computed
+        once per resize instead of on every painted frame.
+        """
+        self._h = h = self.height()
+        self._border_r = h / 2
+        self._toggle_w = h * 2
+        self._toggle_margin = h * 0.3
+        self._circle_size = h * 0.8
+        self._circle_min, self._circle_max = h * 0.1, h * 1.1
 
     def update_pos_color(self, checked=None):
-        self._circle_pos = self.height() * (1.1 if checked else 0.1)
+        self._circle_pos = self._circle_max if checked else self._circle_min
         if self.isChecked():
-            self._intermediate_bg_color = self._active_color
+            self._cached_bg_qcolor.setRgbF(*self._active_color.getRgbF())
         else:
-            self._intermediate_bg_color = self._bg_color
+            self._cached_bg_qcolor.setRgbF(*self._bg_color.getRgbF())
 
     def start_transition(self, state):
-        if not self._user_checked:  # Skip animation if change isn't user-initiated
-            self.update_pos_color(state)
-            return
-        for anim in [self.create_animation, self.create_bg_color_animation]:
-            animation = anim(state)
-            animation.start()
-        self._user_checked = False  # Reset the flag after animation starts
-
-    def mousePressEvent(self, event):
-        self._user_checked = True  # Set flag when user manually clicks the toggle
-        super().mousePressEvent(event)
-
-    def create_animation(self, state):
-        return self._create_common_animation(
-            state, b'circle_pos', self.height() * 0.1, self.height() * 1.1)
-
-    def create_bg_color_animation(self, state):
-        return self._create_common_animation(
-            state, b'intermediate_bg_color', self._bg_color, self._active_color)
-
-    def _create_common_animation(self, state, prop, start_val, end_val):
-        animation = QPropertyAnimation(self, prop, self)
-        animation.setEasingCurve(QEasingCurve.Type.InOutCubic)
-        animation.setDuration(self._animation_duration)
-        animation.setStartValue(start_val if state else end_val)
-        animation.setEndValue(end_val if state else start_val)
-        return animation
+        off = (self._circle_min, self._bg_color.getRgbF())
+        on = (self._circle_max, self._active_color.getRgbF())
+        self._anim_start, self._anim_end = off, on
+        self._anim.stop()
+        # The animation always runs off -> on, unchecking just plays it back
+        self._anim.setDirection(
+            QAbstractAnimation.Direction.Forward if state else
+            QAbstractAnimation.Direction.Backward)
+        self._anim.start()
+
+    def checkState(self) -> Qt.CheckState:
+        return Qt.CheckState.Checked if self.isChecked() else \
+            Qt.CheckState.Unchecked
+
+    def setCheckState(self, state: Qt.CheckState):
+        # PartiallyChecked counts as checked, since there is no tristate
+        self.setChecked(state != Qt.CheckState.Unchecked)
+
+    def _on_toggled(self, checked):
+        self._anim.stop()  # A running transition would overwrite the snap
+        self.update_pos_color(checked)
+        state = self.checkState()
+        self.stateChanged.emit(state.value)
+        self.checkStateChanged.emit(state)
+
+    def nextCheckState(self):
+        # Called by Qt for clicks, key presses, click() and animateClick(),
+        # but not for setChecked, so only those toggles animate
+        super().nextCheckState()
+        self.start_transition(self.isChecked())
+
+    def _on_anim_tick(self, t):
+        (s_pos, (s_r, s_g, s_b, s_a)), (e_pos, (e_r, e_g, e_b, e_a)) = \
+            self._anim_start, self._anim_end
+        self._circle_pos = s_pos + (e_pos - s_pos) * t
+        self._cached_bg_qcolor.setRgbF(
+            s_r + (e_r - s_r) * t, s_g + (e_g - s_g) * t,
+            s_b + (e_b - s_b) * t, s_a + (e_a - s_a) * t)
+        self._update_toggle()
+
+    def _update_toggle(self):
+        # Only invalidate the toggle area, so the text isn't redrawn per frame
+        self.update(0, 0, int(self._toggle_w) + 1, self._h)
 
     def showEvent(self, event):
         super().showEvent(event)  # Ensure to call the super class's implementation
+        self._recompute_geom()
         self.update_pos_color(self.isChecked())
 
     def resizeEvent(self, event):
+        self._text_baseline = self._disabled_pixmap = None
+        self._recompute_geom()
         self.update_pos_color(self.isChecked())
 
+    def setText(self, text: str):
+        self._text_w = None
+        super().setText(text)
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            self._text_w = self._text_baseline = None
+        elif event.type() == QEvent.Type.EnabledChange:
+            # Finish any transition, so the disabled frame isn't built from an
+            # in-flight (quantized) animation frame
+            self._anim.stop()
+            self.update_pos_color(self.isChecked())
+            self._disabled_pixmap = None
+        super().changeEvent(event)
+
     def sizeHint(self):
-        size = super().sizeHint()
-        text_width = QFontMetrics(
-            self.font()).boundingRect(self.text()).width()
-        size.setWidth(int(self.height() * 2 + text_width * 1.075))
-        return size
+        if self._text_w is None:
+            self._text_w = QFontMetrics(
+                self.font()).horizontalAdvance(self.text())
+        return QSize(int(self._toggle_w + self._text_w * 1.075), self._h)
 
     def hitButton(self, pos: QPoint):
         return self.contentsRect().contains(pos)
 
+    def _toggle_pixmap(self, bg_color, circle_color):
+        """
+        Return the pre-rendered background and circle for the current frame.
+        While animating, the circle position is bucketed to half pixels and
+        the background RGB slightly quantized, so repeated animations reuse
+        cached frames. Frames at rest are drawn exactly.
+        """
+        dpr = self.devicePixelRatioF()
+        r, g, b, a = bg_color.getRgb()
+        pos = self._circle_pos
+        if self._anim.state() == QAbstractAnimation.State.Running:
+            r, g, b, pos = r & ~3, g & ~3, b & ~3, int(pos * 2) / 2
+        bg_rgba = (r, g, b, a)
+        key = (self._h, dpr, bg_rgba, circle_color.rgba(), pos)
+        cache = self._frame_cache
+        pixmap = cache.pop(key, None)
+        if pixmap is None:
+            pixmap = QPixmap(math.ceil(self._toggle_w * dpr),
+                             math.ceil(self._h * dpr))
+            pixmap.setDevicePixelRatio(dpr)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            for brush, color in ((self._bg_brush, QColor(*bg_rgba)),
+                                 (self._circle_brush, circle_color)):
+                if brush.color() != color:  # Skip setColor if unchanged
+                    brush.setColor(color)
+            painter = QPainter(pixmap)
+            painter.setRenderHint(self._ANTIALIASING)
+            painter.setPen(self._NO_PEN)  # Set once, only the brush changes
+            painter.setBrush(self._bg_brush)
+            painter.drawRoundedRect(QRectF(0, 0, self._toggle_w, self._h),
+                                    self._border_r, self._border_r)
+            painter.setBrush(self._circle_brush)
+            painter.drawEllipse(QRectF(pos, self._circle_min,
+                                       self._circle_size, self._circle_size))
+            painter.end()
+            if len(cache) >= self._FRAME_CACHE_SIZE:
+                del cache[next(iter(cache))]  # Evict the least recently used
+        cache[key] = pixmap  # (Re)insert as the most recently used
+        return pixmap
+
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        circle_color = QColor(
-            self.disabled_color if not self.isEnabled() else self.circle_color)
-        bg_color = QColor(
-            self.disabled_color if not self.isEnabled() else
-            self.intermediate_bg_color)
-        text_color = QColor(
-            self.disabled_color if not self.isEnabled() else self.text_color)
-
-        bordersradius = self.height() / 2
-        togglewidth = self.height() * 2
-        togglemargin = self.height() * 0.3
-        circlesize = self.height() * 0.8
-
-        bg_path = QPainterPath()
-        bg_path.addRoundedRect(
-            0, 0, togglewidth, self.height(), bordersradius, bordersradius)
-        painter.fillPath(bg_path, QBrush(bg_color))
-
-        circle = QPainterPath()
-        circle.addEllipse(
-            self.circle_pos, self.height() * 0.1, circlesize, circlesize)
-        painter.fillPath(circle, QBrush(circle_color))
-
-        painter.setPen(QPen(QColor(text_color)))
-        painter.setFont(self.font())
+        painter.setRenderHint(self._ANTIALIASING)
+
+        h, togglewidth, togglemargin = \
+            self._h, self._toggle_w, self._toggle_margin
+
+        region = event.region()  # Only draw the parts that need repainting
+        toggle_rect = QRect(0, 0, int(togglewidth) + 1, h)
         text_rect = QRect(int(togglewidth + togglemargin), 0, self.width() -
-                          int(togglewidth + togglemargin), self.height())
-        text_rect.adjust(
-            0, (self.height() - painter.fontMetrics().height()) // 2, 0, 0)
-        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft |
-                         Qt.AlignmentFlag.AlignVCenter, self.text())
+                          int(togglewidth + togglemargin), h)
+
+        if not self.isEnabled():  # Uniform color, blit the static frame
+            if self._disabled_pixmap is None or \
+                    self._disabled_pixmap.devicePixelRatio() != \
+                    self.devicePixelRatioF():  # Moved to another screen
+                self._disabled_pixmap = self._toggle_pixmap(
+                    self._disabled_color, self._disabled_color)
+            painter.drawPixmap(0, 0, self._disabled_pixmap)
+            text_color = self._disabled_color
+        else:
+            if region.intersects(toggle_rect):
+                painter.drawPixmap(0, 0, self._toggle_pixmap(
+                    self._cached_bg_qcolor, self._circle_color))
+            text_color = self._text_color
+
+        if self._text_pen.color() != text_color:  # Skip setColor if unchanged
+            self._text_pen.setColor(text_color)
+
+        if region.intersects(text_rect):
+            painter.setPen(self._text_pen)  # Already uses the widget font
+            if self._text_baseline is None:
+                metrics = QFontMetrics(self.font())
+                self._text_baseline = (
+                    h + metrics.ascent() - metrics.descent()) // 2
+            painter.drawText(text_rect.x(), self._text_baseline, self.text())
         painter.end()
 
 